@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 # encoding: utf-8
 
-import io
-from typing import Any, AsyncGenerator, Generator, List, Dict, Optional
+import asyncio
+import concurrent.futures
+import contextlib
+import inspect
+import tempfile
+from typing import Any, AsyncGenerator, Generator, List, Optional, TypeVar
 
 from pydantic import AnyUrl
 import httpx
@@ -10,7 +14,87 @@ from langchain_core.documents import Document
 from langchain.document_loaders.base import BaseLoader
 from langchain_unstructured import UnstructuredLoader
 
-from .models import Attachment, Comment, Issue
+from .models import (
+    ISSUE_DECODER,
+    ISSUES_DECODER,
+    Attachment,
+    Comment,
+    Issue,
+    IssuesResponse,
+)
+
+T = TypeVar("T")
+
+ISSUES_PER_PAGE = 100  # the maximum limit accepted by Redmine
+ATTACHMENT_CHUNK_SIZE = 1 << 16
+ATTACHMENT_SPOOL_SIZE = 1 << 20  # attachments larger than this spill to disk
+
+
+async def _buffer(
+    agen: AsyncGenerator[T, None], size: int = 4
+) -> AsyncGenerator[T, None]:
+    """Run an async generator ahead of its consumer.
+    A background task keeps pulling up to size items into a queue,
+    so that the producing and the consuming stages overlap.
+
+    :param agen: the producing stage
+    :type agen: AsyncGenerator[T, None]
+    :param size: number of items to prefetch
+    :type size: int
+    :return: items of agen
+    :rtype: AsyncGenerator[T, None]
+    """
+    # the queue itself is unbounded so that the end marker never blocks,
+    # the slots bound how far the producer may run ahead
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(size)
+    end = object()
+
+    async def produce() -> None:
+        error: Optional[BaseException] = None
+        try:
+            async with contextlib.aclosing(agen):
+                while True:
+                    # take a slot before pulling, so at most size items run ahead
+                    await slots.acquire()
+                    try:
+                        item = await anext(agen)
+                    except StopAsyncIteration:
+                        break
+                    queue.put_nowait((item, None))
+        except Exception as e:
+            error = e
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            queue.put_nowait((end, error))
+
+    task = asyncio.create_task(produce())
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                break
+            slots.release()
+            yield item
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+class _SpooledFile(tempfile.SpooledTemporaryFile):
+    """SpooledTemporaryFile that never reports a name.
+    Once spilled to disk its name is the file descriptor, which unstructured
+    would take for a path; without a name it uses metadata_filename instead.
+    """
+
+    @property
+    def name(self) -> None:
+        return None
 
 
 class RedmineLoader(BaseLoader):
@@ -28,9 +112,14 @@ class RedmineLoader(BaseLoader):
     :type include_attachments: Optional[bool]
     :param attachment_maxcharsize: Document length to read per an attachment.
     :type attachment_maxcharsize: Optional[int]
+    :param max_concurrency: Number of attachments to download at once.
+    :type max_concurrency: Optional[int]
     :param *args: args for httpx client
     :type *args: Any
-    :param **kwargs: kwargs for httpx client
+    :param **kwargs: kwargs for httpx client.
+        HTTP/2 and a larger connection pool are enabled unless overridden.
+        Unknown argument names raise TypeError here, but the clients are created
+        on first use, so invalid values (e.g. a malformed proxy) only raise then.
     :type **kwargs: Any
     """
 
@@ -42,17 +131,113 @@ class RedmineLoader(BaseLoader):
         include_comments: Optional[bool] = False,
         include_attachments: Optional[bool] = False,
         attachment_maxcharsize: Optional[int] = 100000,
+        max_concurrency: Optional[int] = 8,
         *keys: Any,
         **kwargs: Any,
     ):
-        self.async_client = httpx.AsyncClient(*keys, **kwargs)
-        self.client = httpx.Client(*keys, **kwargs)
+        kwargs.setdefault("http2", True)
+        kwargs.setdefault(
+            "limits",
+            httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+        # clients are created on first use, but bad arguments should fail here
+        inspect.signature(httpx.Client).bind(*keys, **kwargs)
+        inspect.signature(httpx.AsyncClient).bind(*keys, **kwargs)
+        self._client_keys = keys
+        self._client_kwargs = kwargs
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
         self._redmine_url = redmine_url
         self._api_key = api_key
         self._issue_ids = issue_ids
         self._include_comments = include_comments
         self._include_attachments = include_attachments
         self._attachment_maxcharsize = attachment_maxcharsize
+        self._max_concurrency = max_concurrency
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+        # request headers and params never change, so build them only once
+        self._headers: dict[str, str] = {
+            "X-Redmine-API-Key": self._api_key,
+            "Content-Type": "application/json",
+        }
+        # not only opened but also closed
+        self._issues_params: dict[str, str] = {"status_id": "*"}
+        if self._issue_ids:
+            self._issues_params["issue_id"] = ",".join(
+                [str(s) for s in self._issue_ids]
+            )
+        includes = []
+        if self._include_attachments:
+            includes.append("attachments")
+        if self._include_comments:
+            includes.append("journals")
+        if includes != []:
+            self._issues_params["include"] = ",".join(includes)
+        self._issue_params: dict[str, str] = {}
+        if self._include_comments:
+            self._issue_params["include"] = "journals"
+
+    @property
+    def client(self) -> httpx.Client:
+        """Get httpx client, created on first use.
+
+        :return: the client
+        :rtype: httpx.Client
+        """
+        if self._client is None:
+            self._client = httpx.Client(*self._client_keys, **self._client_kwargs)
+        return self._client
+
+    @client.setter
+    def client(self, client: httpx.Client) -> None:
+        self._client = client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Get httpx async client, created on first use.
+
+        :return: the client
+        :rtype: httpx.AsyncClient
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                *self._client_keys, **self._client_kwargs
+            )
+        return self._async_client
+
+    @async_client.setter
+    def async_client(self, async_client: httpx.AsyncClient) -> None:
+        self._async_client = async_client
+
+    def close(self) -> None:
+        """Close the clients and the attachment workers."""
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self._client is not None:
+            self._client.close()
+
+    async def aclose(self) -> None:
+        """Close the clients and the attachment workers asynchronously."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+        # waiting for the workers would block the running event loop
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if self._client is not None:
+            self._client.close()
+
+    def __enter__(self) -> "RedmineLoader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "RedmineLoader":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
 
     def lazy_load(self) -> Generator[Document, None, None]:
         """Get Issue Document
@@ -76,7 +261,7 @@ class RedmineLoader(BaseLoader):
         :return: the Documents
         :rtype: AsyncGenerator[Document, None]
         """
-        async for issue in self.fetch_issues_async():
+        async for issue in _buffer(self.fetch_issues_async()):
             llm_text = self.format_issue_description(issue)
             yield Document(
                 page_content=llm_text.strip(),
@@ -93,10 +278,7 @@ class RedmineLoader(BaseLoader):
         :return: Request Headers
         :rtype: dict[str, str]
         """
-        return {
-            "X-Redmine-API-Key": self._api_key,
-            "Content-Type": "application/json",
-        }
+        return self._headers
 
     @property
     def issues_params(self) -> dict[str, str]:
@@ -106,15 +288,7 @@ class RedmineLoader(BaseLoader):
         :return: Request Params
         :rtype: dict[str, str]
         """
-        params = {"status_id": "*"}  # not only opened but also closed
-        if self._issue_ids:
-            params["issue_id"] = ",".join([str(s) for s in self._issue_ids])
-        includes = []
-        if self._include_attachments:
-            includes.append("attachments")
-        if includes != []:
-            params["include"] = ",".join(includes)
-        return params
+        return self._issues_params
 
     @property
     def issue_params(self) -> dict[str, str]:
@@ -124,13 +298,7 @@ class RedmineLoader(BaseLoader):
         :return: Request Params
         :rtype: dict[str, str]
         """
-        params = {}
-        includes = []
-        if self._include_comments:
-            includes.append("journals")
-        if includes != []:
-            params["include"] = ",".join(includes)
-        return params
+        return self._issue_params
 
     def fetch_issues(self) -> Generator[Issue, None, None]:
         """Fetch issues
@@ -139,154 +307,287 @@ class RedmineLoader(BaseLoader):
         :rtype: Generator[Issue, None, None]
         :raises Exception: HTTPStatusError if response was invalid.
         """
-        response = self.client.get(
-            f"{self._redmine_url}/issues.json",
-            headers=self.headers,
-            params=self.issues_params,
-        )
-        response.raise_for_status()
-        issues_data: Dict = response.json()
-        issue_data: List
-        for issue_data in issues_data.get("issues", []):
-            issue = Issue(**issue_data, attachments_=[], comments_=[])
+        issue: Issue
+        for issue in self._fetch_issue_pages():
             if self._include_attachments:
-                issue.attachments_ = self._fetch_attachments(issue_data)
+                issue.attachments_ = self._fetch_attachments(issue)
             if self._include_comments:
-                issue.comments_ = self._fetch_comments(issue)
+                if issue.journals is not None:
+                    issue.comments_ = issue.journals
+                else:
+                    issue.comments_ = self._fetch_comments(issue)
             yield issue
 
+    def _issues_request(
+        self, client: httpx.Client | httpx.AsyncClient, offset: int
+    ) -> httpx.Request:
+        """Build the request of a page of issues.
+
+        :param client: the client to send the request with
+        :type client: httpx.Client | httpx.AsyncClient
+        :param offset: offset of the first issue of the page
+        :type offset: int
+        :return: Request
+        :rtype: httpx.Request
+        """
+        return client.build_request(
+            "GET",
+            f"{self._redmine_url}/issues.json",
+            headers=self._headers,
+            params={
+                **self._issues_params,
+                "offset": offset,
+                "limit": ISSUES_PER_PAGE,
+            },
+        )
+
+    @staticmethod
+    def _has_next_page(issues_response: IssuesResponse, offset: int) -> bool:
+        """Tell whether a page of issues starts at offset.
+
+        :param issues_response: the previous page
+        :type issues_response: IssuesResponse
+        :param offset: offset of the next page
+        :type offset: int
+        :return: True if there is a next page
+        :rtype: bool
+        """
+        if not issues_response.issues:
+            return False
+        if issues_response.total_count is None:
+            limit = issues_response.limit or ISSUES_PER_PAGE
+            return len(issues_response.issues) >= limit
+        return offset < issues_response.total_count
+
+    def _fetch_issue_pages(self) -> Generator[Issue, None, None]:
+        """Fetch issues of every page.
+        Each page is decoded at once, and the next page is requested
+        in background while the current one is consumed.
+
+        :return: Issues
+        :rtype: Generator[Issue, None, None]
+        :raises Exception: HTTPStatusError if response was invalid.
+        """
+
+        def send(offset: int) -> httpx.Response:
+            return self.client.send(self._issues_request(self.client, offset))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            offset = 0
+            page: Optional[concurrent.futures.Future] = executor.submit(send, offset)
+            try:
+                while page is not None:
+                    response = page.result()
+                    page = None
+                    response.raise_for_status()
+                    issues_response = ISSUES_DECODER.decode(response.content)
+                    # Redmine may cap the page below the requested limit
+                    offset += len(issues_response.issues)
+                    if self._has_next_page(issues_response, offset):
+                        page = executor.submit(send, offset)
+                    yield from issues_response.issues
+            finally:
+                if page is not None:
+                    page.cancel()
+
     async def fetch_issues_async(self) -> AsyncGenerator[Issue, None]:
         """Fetch issues asynchronously.
+        Issues are read ahead while attachments and comments of
+        the previous ones are being fetched.
 
         :return: Issues
         :rtype: AsyncGenerator[Issue, None]
         :raises Exception: HTTPStatusError if response was invalid.
         """
-        response = await self.async_client.get(
-            f"{self._redmine_url}/issues.json",
-            headers=self.headers,
-            params=self.issues_params,
-        )
-        response.raise_for_status()
-        issues_data: Dict = response.json()
-        issue_data: List
-        for issue_data in issues_data.get("issues", []):
-            attachments = []
+        # asyncio primitives bind to the running loop, so create one per run
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        issue: Issue
+        async for issue in _buffer(self._fetch_issue_pages_async()):
             if self._include_attachments:
-                attachments = [
-                    attachment
-                    async for attachment in self._fetch_attachments_async(issue_data)
-                ]
-            issue = Issue(**issue_data, attachments_=attachments)
+                issue.attachments_ = await self._fetch_attachments_async(
+                    issue, semaphore
+                )
             if self._include_comments:
-                issue.comments_ = [c async for c in self._fetch_comments_async(issue)]
+                if issue.journals is not None:
+                    issue.comments_ = issue.journals
+                else:
+                    issue.comments_ = await self._fetch_comments_async(issue)
             yield issue
 
-    def _fetch_comments(self, issue: Issue) -> Generator[Comment, None, None]:
+    async def _fetch_issue_pages_async(self) -> AsyncGenerator[Issue, None]:
+        """Fetch issues of every page asynchronously.
+        Each page is decoded at once, and the next page is requested
+        in background while the current one is consumed.
+
+        :return: Issues
+        :rtype: AsyncGenerator[Issue, None]
+        :raises Exception: HTTPStatusError if response was invalid.
+        """
+
+        async def send(offset: int) -> httpx.Response:
+            request = self._issues_request(self.async_client, offset)
+            return await self.async_client.send(request)
+
+        offset = 0
+        page: Optional[asyncio.Task] = asyncio.create_task(send(offset))
+        try:
+            while page is not None:
+                response = await page
+                page = None
+                response.raise_for_status()
+                issues_response = ISSUES_DECODER.decode(response.content)
+                # Redmine may cap the page below the requested limit
+                offset += len(issues_response.issues)
+                if self._has_next_page(issues_response, offset):
+                    page = asyncio.create_task(send(offset))
+                for issue in issues_response.issues:
+                    yield issue
+        finally:
+            if page is not None and not page.cancel() and not page.cancelled():
+                page.exception()  # a failed prefetch of an unused page is fine
+
+    def _fetch_comments(self, issue: Issue) -> List[Comment]:
         """Fetch comments of an issue
 
-        :param issue_id: Issue ID
-        :type issue_id: int
+        :param issue: The issue object
+        :type issue: Issue
         :return: List of comments
-        :rtype: Generator[Comment]
+        :rtype: List[Comment]
         :raises Exception: HTTPStatusError if response from Redmine was invalid.
         """
         response = self.client.get(
             f"{self._redmine_url}/issues/{issue.id}.json",
-            headers=self.headers,
-            params=self.issue_params,
+            headers=self._headers,
+            params=self._issue_params,
         )
         response.raise_for_status()
-        issue_data: Dict = response.json()
-        journals_data: List[Dict] = issue_data.get("issue", {}).get("journals", [])
-        for journal_data in journals_data:
-            who = journal_data.get("user", {}).get("name", "Anonymous")
-            yield Comment(**journal_data, who_=who)
-
-    async def _fetch_comments_async(
-        self, issue: Issue
-    ) -> AsyncGenerator[Comment, None]:
+        return ISSUE_DECODER.decode(response.content).issue.journals
+
+    async def _fetch_comments_async(self, issue: Issue) -> List[Comment]:
         """Fetch comments of an issue asynchronously.
 
         :param issue: The issue object
         :type issue: Issue
         :return: List of comments
-        :rtype: AsyncGenerator[Comment, None]
+        :rtype: List[Comment]
         :raises Exception: HTTPStatusError if response from Redmine was invalid.
         """
         response = await self.async_client.get(
             f"{self._redmine_url}/issues/{issue.id}.json",
-            headers=self.headers,
-            params=self.issue_params,
+            headers=self._headers,
+            params=self._issue_params,
         )
         response.raise_for_status()
-        issue_data: Dict = response.json()
-        journals_data: List[Dict] = issue_data.get("issue", {}).get("journals", [])
-        for journal_data in journals_data:
-            who = journal_data.get("user", {}).get("name", "Anonymous")
-            yield Comment(**journal_data, who_=who)
+        return ISSUE_DECODER.decode(response.content).issue.journals
 
     def _fetch_attachments(
         self,
-        issue_data: Dict,
-    ) -> Generator[Attachment, None, None]:
+        issue: Issue,
+    ) -> List[Attachment]:
         """Fetch attachments of an issue
+        Attachments are downloaded concurrently, up to max_concurrency at once.
 
-        :param issue_data: issue data
-        :type issue_data: Dict
+        :param issue: the issue
+        :type issue: Issue
         :return: List of Attachment
-        :rtype: Generator[Attachment, None, None]
+        :rtype: List[Attachment]
         """
-        attachments_data: List[Dict] = issue_data.get("attachments", [])
-        for attachment_data in attachments_data:
-            attachment = Attachment(**attachment_data)
-            attachment.documents_ = [
-                doc for doc in self.__process_attachment(attachment)
-            ]
-            yield attachment
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_concurrency
+            )
+        futures = [
+            self._executor.submit(self.__load_attachment, attachment)
+            for attachment in issue.attachments
+        ]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            # do not leave the rest running or queued on the shared pool
+            for future in futures:
+                future.cancel()
+            raise
+
+    def __load_attachment(self, attachment: Attachment) -> Attachment:
+        """Load documents of an attachment.
+
+        :param attachment: Attachment of an issue
+        :type attachment: Attachment
+        :return: the Attachment with its documents
+        :rtype: Attachment
+        """
+        attachment.documents_ = list(self.__process_attachment(attachment))
+        return attachment
 
     async def _fetch_attachments_async(
         self,
-        issue_data: Dict,
-    ) -> AsyncGenerator[Attachment, None]:
+        issue: Issue,
+        semaphore: asyncio.Semaphore,
+    ) -> List[Attachment]:
         """Fetch attachments of an issue asynchronously.
+        Attachments are downloaded concurrently, up to max_concurrency at once.
 
-        :param issue_data: issue data
-        :type issue_data: Dict
+        :param issue: the issue
+        :type issue: Issue
+        :param semaphore: semaphore bounding concurrent downloads
+        :type semaphore: asyncio.Semaphore
         :return: List of Attachment
-        :rtype: Generator[Attachment, None, None]
+        :rtype: List[Attachment]
         """
-        attachments_data: List[Dict] = issue_data.get("attachments", [])
-        for attachment_data in attachments_data:
-            attachment = Attachment(**attachment_data)
+        try:
+            # a failing download cancels the others instead of leaving them running
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(self.__load_attachment_async(attachment, semaphore))
+                    for attachment in issue.attachments
+                ]
+        except ExceptionGroup as group:
+            raise group.exceptions[0]
+        return [task.result() for task in tasks]
+
+    async def __load_attachment_async(
+        self, attachment: Attachment, semaphore: asyncio.Semaphore
+    ) -> Attachment:
+        """Load documents of an attachment asynchronously.
+
+        :param attachment: Attachment of an issue
+        :type attachment: Attachment
+        :param semaphore: semaphore bounding concurrent downloads
+        :type semaphore: asyncio.Semaphore
+        :return: the Attachment with its documents
+        :rtype: Attachment
+        """
+        async with semaphore:
             attachment.documents_ = [
                 doc async for doc in self.__process_attachment_async(attachment)
             ]
-            yield attachment
+        return attachment
 
     def __process_attachment(
         self, attachment: Attachment
     ) -> Generator[Document, Any, Any]:
-        """Process an attachment and return a list of documents.
+        """Process an attachment and yield its documents one by one.
 
         :param attachment: Attachment of an issue
         :type attachment: Attachment
-        :return: List of Document
-        :rtype: List[Document]
+        :return: Documents of the attachment
+        :rtype: Generator[Document, Any, Any]
         """
-        response = self.client.get(str(attachment.content_url))
-        response.raise_for_status()
-        fp = io.BytesIO(response.content)
-        attachment_loader = UnstructuredLoader(
-            file=fp,
-            metadata_filename=attachment.filename,
-            chunking_strategy="basic",
-            max_characters=self._attachment_maxcharsize,
-        )
-        docs = attachment_loader.load()
-        for document in docs:
-            document.metadata["source"] = attachment.content_url
-            yield document
+        with _SpooledFile(max_size=ATTACHMENT_SPOOL_SIZE) as fp:
+            with self.client.stream("GET", str(attachment.content_url)) as response:
+                response.raise_for_status()
+                for chunk in response.iter_bytes(ATTACHMENT_CHUNK_SIZE):
+                    fp.write(chunk)
+            fp.seek(0)
+            attachment_loader = UnstructuredLoader(
+                file=fp,
+                metadata_filename=attachment.filename,
+                chunking_strategy="basic",
+                max_characters=self._attachment_maxcharsize,
+            )
+            for document in attachment_loader.lazy_load():
+                document.metadata["source"] = attachment.content_url
+                yield document
 
     async def __process_attachment_async(
         self, attachment: Attachment
@@ -298,16 +599,21 @@ class RedmineLoader(BaseLoader):
         :return: List of Document
         :rtype: AsyncGenerator[Document, Any]
         """
-        response = await self.async_client.get(str(attachment.content_url))
-        response.raise_for_status()
-        fp = io.BytesIO(response.read())
-        attachment_loader = UnstructuredLoader(
-            file=fp,
-            metadata_filename=attachment.filename,
-            chunking_strategy="basic",
-            max_characters=self._attachment_maxcharsize,
-        )
-        docs = await attachment_loader.aload()
+        with _SpooledFile(max_size=ATTACHMENT_SPOOL_SIZE) as fp:
+            async with self.async_client.stream(
+                "GET", str(attachment.content_url)
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(ATTACHMENT_CHUNK_SIZE):
+                    fp.write(chunk)
+            fp.seek(0)
+            attachment_loader = UnstructuredLoader(
+                file=fp,
+                metadata_filename=attachment.filename,
+                chunking_strategy="basic",
+                max_characters=self._attachment_maxcharsize,
+            )
+            docs = await attachment_loader.aload()
         for document in docs:
             document.metadata["source"] = attachment.content_url
             yield document
@@ -325,24 +631,29 @@ class RedmineLoader(BaseLoader):
         :return: Formatted description of an issue
         :rtype: str
         """
-        description = f"**Subject**:\n{issue.subject}\n\n"
-        description += f"**Description**:\n{issue.description}\n\n"
+        parts: List[str] = [
+            "**Subject**:\n",
+            issue.subject,
+            "\n\n**Description**:\n",
+            issue.description,
+            "\n\n",
+        ]
         if self._include_comments:
-            description += "**Comments**:\n"
-            for comment in issue.comments_:
-                if comment.notes:
-                    description += (
-                        f"""\n'{comment.who_}' said:\n```{comment.notes}```\n"""
+            comments = [comment for comment in issue.comments_ if comment.notes]
+            if comments:
+                parts.append("**Comments**:\n")
+                for comment in comments:
+                    parts.extend(
+                        ("\n'", comment.who_, "' said:\n```", comment.notes, "```\n")
                     )
-            description += "\n\n"
-        if self._include_attachments:
-            description += "**Attachments**:\n"
+                parts.append("\n\n")
+        if self._include_attachments and issue.attachments_:
+            parts.append("**Attachments**:\n")
             for attachment in issue.attachments_:
-                description += f"{attachment.filename} instructs:\n"
+                parts.extend((attachment.filename, " instructs:\n"))
                 for document in attachment.documents_:
-                    description += f"```{document.page_content}```"
-                    description += "\n"
-        return description.strip()
+                    parts.extend(("```", document.page_content, "```\n"))
+        return "".join(parts).strip()
 
 
 if __name__ == "__main__":
@@ -1,38 +1,74 @@
 #!/usr/bin/env python3
 # encoding: utf-8
 
-from typing import List, Optional, Annotated
+from typing import List, Annotated, Optional
 
-from pydantic import BaseModel, ConfigDict, Field, AnyUrl
+import msgspec
 from langchain_core.documents import Document
 
 
-class Attachment(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: int = Field(..., description="Attachment ID")
-    filename: str = Field(..., description="Attachment filename")
-    content_url: AnyUrl = Field(..., description="URL to attachment content")
-    content_type: str | None = Field(..., description="Attachment ContentType")
-    documents_: Optional[List[Document]] = Annotated[
-        List[Document], Field(..., description="Documents of an attachment")
+class Attachment(msgspec.Struct, omit_defaults=True):
+    id: Annotated[int, msgspec.Meta(description="Attachment ID")]
+    filename: Annotated[str, msgspec.Meta(description="Attachment filename")]
+    content_url: Annotated[str, msgspec.Meta(description="URL to attachment content")]
+    content_type: Annotated[
+        str | None, msgspec.Meta(description="Attachment ContentType")
     ]
+    documents_: Annotated[
+        List[Document], msgspec.Meta(description="Documents of an attachment")
+    ] = []
 
 
-class Comment(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: int = Field(..., description="Comment ID")
-    notes: str = Field(..., description="Comment text")
-    who_: str = Field(..., description="Who Comment")
+class User(msgspec.Struct, omit_defaults=True):
+    name: Annotated[str, msgspec.Meta(description="User name")] = "Anonymous"
 
 
-class Issue(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: int = Field(..., description="Issue ID")
-    subject: str = Field(..., description="Issue subject")
-    description: str = Field(..., description="Issue description")
-    attachments_: Optional[List[Attachment]] = Annotated[
-        List[Attachment], Field(..., description="Issue attachments")
-    ]
-    comments_: Optional[List[Comment]] = Annotated[
-        List[Comment], Field(..., description="Issue attachments")
-    ]
+class Comment(msgspec.Struct, omit_defaults=True):
+    id: Annotated[int, msgspec.Meta(description="Comment ID")]
+    notes: Annotated[str, msgspec.Meta(description="Comment text")]
+    user: Annotated[Optional[User], msgspec.Meta(description="Comment author")] = None
+    who_: Annotated[str, msgspec.Meta(description="Who Comment")] = "Anonymous"
+
+    def __post_init__(self):
+        if self.user is not None:
+            self.who_ = self.user.name
+
+
+class Issue(msgspec.Struct, omit_defaults=True):
+    id: Annotated[int, msgspec.Meta(description="Issue ID")]
+    subject: Annotated[str, msgspec.Meta(description="Issue subject")]
+    description: Annotated[str, msgspec.Meta(description="Issue description")]
+    attachments: Annotated[
+        List[Attachment], msgspec.Meta(description="Attachments listed by Redmine")
+    ] = []
+    journals: Annotated[
+        Optional[List[Comment]],
+        msgspec.Meta(description="Journals listed by Redmine, None if not included"),
+    ] = None
+    attachments_: Annotated[
+        List[Attachment], msgspec.Meta(description="Issue attachments")
+    ] = []
+    comments_: Annotated[List[Comment], msgspec.Meta(description="Issue comments")] = []
+
+
+class IssuesResponse(msgspec.Struct):
+    issues: Annotated[List[Issue], msgspec.Meta(description="A page of issues")]
+    total_count: Annotated[
+        Optional[int], msgspec.Meta(description="Number of issues of all pages")
+    ] = None
+    limit: Annotated[
+        Optional[int], msgspec.Meta(description="Page size applied by Redmine")
+    ] = None
+
+
+class IssueJournals(msgspec.Struct):
+    journals: Annotated[List[Comment], msgspec.Meta(description="Issue journals")] = []
+
+
+class IssueResponse(msgspec.Struct):
+    issue: Annotated[IssueJournals, msgspec.Meta(description="An issue")]
+
+
+# decoders compile their schema once, so share them instead of building per call
+ISSUES_DECODER = msgspec.json.Decoder(IssuesResponse)
+ISSUE_DECODER = msgspec.json.Decoder(IssueResponse)
@@ -1,8 +1,22 @@
 #!/usr/bin/env python3
 # encoding: utf-8
 
+import asyncio
+import concurrent.futures
+import json
+import time
+
+import httpx
 import pytest
+from langchain_core.documents import Document
 from redmine_loader import RedmineLoader
+from redmine_loader.loader import (
+    ATTACHMENT_CHUNK_SIZE,
+    ATTACHMENT_SPOOL_SIZE,
+    _buffer,
+    _SpooledFile,
+)
+from redmine_loader.models import Attachment, Comment, Issue
 
 
 def test_init():
@@ -61,3 +75,447 @@ def test_init():
 #     )
 #     loader.client = mock_client
 #     # loader.load()
+
+
+@pytest.mark.parametrize(
+    "mock_client",
+    [
+        1,
+    ],
+    indirect=True,
+)
+def test_fetch_issues(mock_client):
+    loader = RedmineLoader(redmine_url="http://issues.com")
+    loader.client = mock_client
+    issues = list(loader.fetch_issues())
+    assert [issue.id for issue in issues] == [1]
+    assert issues[0].subject == "War Game"
+
+
+@pytest.mark.parametrize(
+    "total, cap, offsets",
+    [
+        (0, 100, [0]),
+        (1, 100, [0]),
+        (200, 100, [0, 100]),
+        (250, 100, [0, 100, 200]),
+        (60, 25, [0, 25, 50]),
+    ],
+)
+def test_fetch_issues_pages(total, cap, offsets):
+    requested = []
+
+    def transport(request: httpx.Request) -> httpx.Response:
+        offset = int(request.url.params["offset"])
+        limit = min(int(request.url.params["limit"]), cap)
+        requested.append(offset)
+        issues = [
+            {"id": i, "subject": f"subject {i}", "description": ""}
+            for i in range(offset + 1, min(offset + limit, total) + 1)
+        ]
+        return httpx.Response(
+            200, json={"issues": issues, "total_count": total, "limit": limit}
+        )
+
+    loader = RedmineLoader(redmine_url="http://issues.com")
+    loader.client = httpx.Client(transport=httpx.MockTransport(transport))
+    issues = list(loader.fetch_issues())
+    assert [issue.id for issue in issues] == list(range(1, total + 1))
+    assert requested == offsets
+
+    async def fetch_issues_async():
+        return [issue async for issue in loader.fetch_issues_async()]
+
+    requested.clear()
+    loader.async_client = httpx.AsyncClient(transport=httpx.MockTransport(transport))
+    issues = asyncio.run(fetch_issues_async())
+    assert [issue.id for issue in issues] == list(range(1, total + 1))
+    assert requested == offsets
+
+
+def test_fetch_issues_pages_error():
+    requested = []
+
+    def transport(request: httpx.Request) -> httpx.Response:
+        requested.append(int(request.url.params["offset"]))
+        return httpx.Response(401)
+
+    loader = RedmineLoader(redmine_url="http://issues.com")
+    loader.client = httpx.Client(transport=httpx.MockTransport(transport))
+    with pytest.raises(httpx.HTTPStatusError):
+        list(loader.fetch_issues())
+    assert requested == [0]
+
+    async def fetch_issues_async():
+        return [issue async for issue in loader.fetch_issues_async()]
+
+    requested.clear()
+    loader.async_client = httpx.AsyncClient(transport=httpx.MockTransport(transport))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(fetch_issues_async())
+    assert requested == [0]
+
+
+def test_format_issue_description():
+    loader = RedmineLoader(
+        redmine_url="http://issues.com",
+        include_comments=True,
+        include_attachments=True,
+    )
+    issue = Issue(
+        id=1,
+        subject="War Game",
+        description="Shall we play a game?",
+        attachments_=[
+            Attachment(
+                id=1,
+                filename="attachment.txt",
+                content_url="http://issues.com/attachment.txt",
+                content_type="text/plain",
+                documents_=[Document(page_content="Global Thermonuclear War")],
+            )
+        ],
+        comments_=[
+            Comment(id=1, notes="", who_="Joshua"),
+            Comment(id=2, notes="How about a nice game of chess?", who_="Joshua"),
+        ],
+    )
+    assert loader.format_issue_description(issue) == (
+        "**Subject**:\nWar Game\n\n"
+        "**Description**:\nShall we play a game?\n\n"
+        "**Comments**:\n"
+        "\n'Joshua' said:\n```How about a nice game of chess?```\n"
+        "\n\n"
+        "**Attachments**:\n"
+        "attachment.txt instructs:\n"
+        "```Global Thermonuclear War```"
+    )
+
+
+def test_fetch_issues_journals():
+    requested = []
+
+    def transport(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        journals = [{"id": 1, "notes": "Hello", "user": {"name": "Falken"}}]
+        if request.url.path == "/issues.json":
+            issues = [
+                {"id": 1, "subject": "inline", "description": "", "journals": journals},
+                {"id": 2, "subject": "fallback", "description": ""},
+            ]
+            return httpx.Response(200, json={"issues": issues})
+        return httpx.Response(200, json={"issue": {"id": 2, "journals": journals}})
+
+    loader = RedmineLoader(redmine_url="http://issues.com", include_comments=True)
+    loader.client = httpx.Client(transport=httpx.MockTransport(transport))
+    issues = list(loader.fetch_issues())
+    assert [[c.who_ for c in issue.comments_] for issue in issues] == [
+        ["Falken"],
+        ["Falken"],
+    ]
+    assert requested == ["/issues.json", "/issues/2.json"]
+
+
+def test_format_issue_description_empty_sections():
+    loader = RedmineLoader(
+        redmine_url="http://issues.com",
+        include_comments=True,
+        include_attachments=True,
+    )
+    issue = Issue(
+        id=1,
+        subject="War Game",
+        description="Shall we play a game?",
+        comments_=[Comment(id=1, notes="", who_="Joshua")],
+    )
+    assert loader.format_issue_description(issue) == (
+        "**Subject**:\nWar Game\n\n**Description**:\nShall we play a game?"
+    )
+
+
+def test_context_manager():
+    with RedmineLoader(redmine_url="http://issues.com") as loader:
+        client = loader.client
+    assert client.is_closed
+
+    async def use_async_client():
+        async with RedmineLoader(redmine_url="http://issues.com") as loader:
+            return loader.async_client
+
+    assert asyncio.run(use_async_client()).is_closed
+
+
+def test_aclose_does_not_wait_for_workers(monkeypatch):
+    loader = RedmineLoader(redmine_url="http://issues.com")
+    loader._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    shutdowns = []
+    monkeypatch.setattr(
+        loader._executor, "shutdown", lambda wait=True: shutdowns.append(wait)
+    )
+    asyncio.run(loader.aclose())
+    assert shutdowns == [False]
+
+
+@pytest.mark.parametrize(
+    "mock_client",
+    [
+        1,
+    ],
+    indirect=True,
+)
+def test_alazy_load_across_event_loops(mock_client, monkeypatch):
+    issues = json.loads(mock_client.get("http://issues.com/issues.json").content)
+    issues["issues"][0]["attachments"] *= 3
+
+    async def process_attachment_async(self, attachment):
+        await asyncio.sleep(0)
+        yield Document(page_content=attachment.filename)
+
+    monkeypatch.setattr(
+        RedmineLoader,
+        "_RedmineLoader__process_attachment_async",
+        process_attachment_async,
+    )
+    loader = RedmineLoader(
+        redmine_url="http://issues.com", include_attachments=True, max_concurrency=1
+    )
+    loader.async_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=issues))
+    )
+    for _ in range(2):
+        docs = asyncio.run(loader.aload())
+        assert docs[0].page_content.count("attachment.txt instructs:") == 3
+    # async runs never start the sync attachment workers
+    assert loader._executor is None
+
+
+def test_fetch_attachments_async_error(monkeypatch):
+    cancelled = []
+
+    async def process_attachment_async(self, attachment):
+        if attachment.id == 1:
+            raise ValueError(attachment.filename)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(attachment.id)
+            raise
+        yield Document(page_content=attachment.filename)
+
+    monkeypatch.setattr(
+        RedmineLoader,
+        "_RedmineLoader__process_attachment_async",
+        process_attachment_async,
+    )
+    loader = RedmineLoader(redmine_url="http://issues.com", include_attachments=True)
+    issue = Issue(
+        id=1,
+        subject="War Game",
+        description="",
+        attachments=[
+            Attachment(
+                id=i,
+                filename=f"{i}.txt",
+                content_url=f"http://issues.com/{i}.txt",
+                content_type="text/plain",
+            )
+            for i in range(1, 4)
+        ],
+    )
+
+    async def fetch_attachments():
+        semaphore = asyncio.Semaphore(8)
+        with pytest.raises(ValueError, match="1.txt"):
+            await loader._fetch_attachments_async(issue, semaphore)
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    # the other downloads are cancelled rather than left running
+    assert asyncio.run(fetch_attachments()) == set()
+    assert sorted(cancelled) == [2, 3]
+
+
+@pytest.mark.parametrize(
+    "mock_client",
+    [
+        1,
+    ],
+    indirect=True,
+)
+def test_fetch_attachments(mock_client, monkeypatch):
+    issues = json.loads(mock_client.get("http://issues.com/issues.json").content)
+    attachment = issues["issues"][0]["attachments"][0]
+    issues["issues"][0]["attachments"] = [
+        {**attachment, "id": i, "filename": f"{i}.txt"} for i in range(3, 0, -1)
+    ]
+
+    def transport(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/issues.json":
+            return httpx.Response(200, json=issues)
+        return mock_client.get(request.url)
+
+    loaded = []
+
+    class FakeUnstructuredLoader:
+        def __init__(self, file, metadata_filename, **kwargs):
+            self.file = file
+            self.filename = metadata_filename
+
+        def lazy_load(self):
+            loaded.append(self.filename)
+            # the first attachment finishes last
+            time.sleep(int(self.filename[0]) / 20)
+            yield Document(page_content=f"{self.filename}: {self.file.read().decode()}")
+
+    monkeypatch.setattr(
+        "redmine_loader.loader.UnstructuredLoader", FakeUnstructuredLoader
+    )
+    loader = RedmineLoader(redmine_url="http://issues.com", include_attachments=True)
+    loader.client = httpx.Client(transport=httpx.MockTransport(transport))
+    (issue,) = loader.fetch_issues()
+    content = mock_client.get(attachment["content_url"]).text
+    assert [
+        [document.page_content for document in attachment.documents_]
+        for attachment in issue.attachments_
+    ] == [[f"{i}.txt: {content}"] for i in range(3, 0, -1)]
+
+    # errors of a worker are raised to the caller and cancel the queued ones
+    issues["issues"][0]["attachments"][0]["content_url"] = "https://a.com/missing"
+    loaded.clear()
+    loader = RedmineLoader(
+        redmine_url="http://issues.com", include_attachments=True, max_concurrency=1
+    )
+    loader.client = httpx.Client(transport=httpx.MockTransport(transport))
+    with pytest.raises(httpx.HTTPStatusError):
+        list(loader.fetch_issues())
+    loader.close()
+    # the single worker may already have picked up the next one, not the last
+    assert "1.txt" not in loaded and len(loaded) <= 1
+
+
+class Stop(BaseException):
+    pass
+
+
+@pytest.mark.parametrize("error", [ValueError, Stop])
+def test_buffer_error(error):
+    async def produce():
+        yield 1
+        yield 2
+        raise error()
+
+    async def consume():
+        items = []
+        with pytest.raises(error):
+            async for item in _buffer(produce(), size=1):
+                items.append(item)
+        return items
+
+    # the consumer must not wait for an end marker that never comes
+    assert asyncio.run(asyncio.wait_for(consume(), timeout=5)) == [1, 2]
+
+
+def test_buffer_size():
+    pulled = []
+
+    async def produce():
+        for i in range(10):
+            pulled.append(i)
+            yield i
+
+    async def consume():
+        buffered = _buffer(produce(), size=1)
+        assert await anext(buffered) == 0
+        for _ in range(10):
+            await asyncio.sleep(0)
+        await buffered.aclose()
+
+    asyncio.run(consume())
+    # one item handed over, one more buffered while the consumer holds it
+    assert pulled == [0, 1]
+
+
+def test_buffer_close():
+    closed = []
+
+    async def produce():
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            closed.append(True)
+
+    async def consume():
+        buffered = _buffer(produce(), size=2)
+        assert await anext(buffered) == 0
+        await buffered.aclose()
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(consume()) == set()
+    assert closed == [True]
+
+
+@pytest.mark.parametrize("size", [10, ATTACHMENT_SPOOL_SIZE + 1])
+def test_process_attachment(size, monkeypatch):
+    content = bytes(i % 251 for i in range(size))
+    writes = []
+    loaded = []
+
+    class SpooledFile(_SpooledFile):
+        def write(self, chunk):
+            writes.append(len(chunk))
+            return super().write(chunk)
+
+    class FakeUnstructuredLoader:
+        def __init__(self, file, metadata_filename, **kwargs):
+            # unstructured must see the attachment's name, not the spool's
+            assert isinstance(file, SpooledFile) and file.name is None
+            loaded.append(file.read())
+
+        def lazy_load(self):
+            yield Document(page_content="")
+
+        async def aload(self):
+            return [Document(page_content="")]
+
+    def transport(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(200, content=content)
+
+    monkeypatch.setattr("redmine_loader.loader._SpooledFile", SpooledFile)
+    monkeypatch.setattr(
+        "redmine_loader.loader.UnstructuredLoader", FakeUnstructuredLoader
+    )
+    loader = RedmineLoader(redmine_url="http://issues.com")
+    loader.client = httpx.Client(transport=httpx.MockTransport(transport))
+    loader.async_client = httpx.AsyncClient(transport=httpx.MockTransport(transport))
+    attachment = Attachment(
+        id=1,
+        filename="attachment.bin",
+        content_url="http://issues.com/attachment.bin",
+        content_type=None,
+    )
+    missing = Attachment(
+        id=2,
+        filename="missing.bin",
+        content_url="http://issues.com/missing",
+        content_type=None,
+    )
+    process = loader._RedmineLoader__process_attachment
+    process_async = loader._RedmineLoader__process_attachment_async
+
+    async def collect(attachment):
+        return [doc async for doc in process_async(attachment)]
+
+    for documents in (list(process(attachment)), asyncio.run(collect(attachment))):
+        assert documents[0].metadata["source"] == attachment.content_url
+    assert loaded == [content, content]
+    assert sum(writes) == 2 * size
+    assert max(writes) <= ATTACHMENT_CHUNK_SIZE
+
+    # a failed download never reaches unstructured
+    with pytest.raises(httpx.HTTPStatusError):
+        list(process(missing))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(collect(missing))
+    assert len(loaded) == 2